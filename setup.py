@@ -4,7 +4,7 @@ from setuptools import setup
 with open('README.md', encoding='utf-8') as readme:
     long_description = readme.read()
 
-INSTALL_REQUIRE = ["numpy>=1.19.2", "pythonds>=1.2.1"]
+INSTALL_REQUIRE = ["numpy>=1.19.2"]
 TESTS_REQUIRE = ["twine>=3.2.0"]
 
 setup(
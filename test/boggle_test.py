@@ -1,7 +1,11 @@
 """Test module for the boggle module."""
 
+import os
+import tempfile
 import unittest
+import numpy as np
 from wordsolver import BoggleSolver
+from wordsolver.boggle import decode_path
 
 
 class BoggleTest(unittest.TestCase):
@@ -36,6 +40,64 @@ class BoggleTest(unittest.TestCase):
             ]))
         )
 
+    def test_from_file_cache(self):
+        """Test the trie saved when loading from a file is reused."""
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "words.txt")
+            with open(filename, "w") as file_text:
+                file_text.write("QUEEN\nTEN\nNET")
+            board = [["Qu", "E", "E", "N"], ["X", "X", "T", "X"]]
+            solutions = BoggleSolver(filename).solve(board, with_positions=True)
+            self.assertTrue(os.path.exists(filename + BoggleSolver.CACHE_SUFFIX))
+            self.assertEqual(
+                solutions,
+                BoggleSolver(filename).solve(board, with_positions=True)
+            )
+            self.assertEqual(
+                ["QUEEN"],
+                BoggleSolver(filename, min_length=4).solve(board)
+            )
+
+    def test_no_substitutions(self):
+        """Test a solver can be defined without any substitutions."""
+
+        class PlainBoggleSolver(BoggleSolver):
+            """Boggle solver without any substitutions."""
+            SUBSTITUTIONS = {}
+
+        solver = PlainBoggleSolver(["CAT", "QUA"])
+        self.assertEqual(
+            {"CAT", "QUA"},
+            set(solver.solve([["C", "A", "T"], ["Q", "U", "A"]]))
+        )
+
+    def test_letters_only(self):
+        """Test only words made of the letters A to Z are loaded."""
+        solver = BoggleSolver(["TET", "ÉTÉ"])
+        self.assertEqual(["TET"], solver.solve([["É", "T", "É"], ["T", "E", "X"]]))
+
+    def test_numpy_board(self):
+        """Test a 2d numpy array can be solved like a list of lists."""
+        board = [["Qu", "E", "N"], ["T", "E", "X"]]
+        self.assertEqual(
+            self.solver.solve([row[:] for row in board], with_positions=True),
+            self.solver.solve(np.array(board), with_positions=True)
+        )
+
+    def test_empty_board(self):
+        """Test a board without any tiles has no solutions."""
+        self.assertEqual([], self.solver.solve([[]]))
+        self.assertEqual([], self.solver.solve([[], []], with_positions=True))
+
+    def test_decode_path(self):
+        """Test packed paths decode to the flat board indices packed."""
+        neighbors = BoggleSolver._build_neighbors(3, 4)
+        for path in ([5], [0, 1, 2, 3, 7, 11, 10, 9, 8, 4], [6, 1, 4, 9, 10, 11, 7]):
+            code = 1
+            for index, adj_index in zip(path, path[1:]):
+                code = code << 3 | neighbors[index].index(adj_index)
+            self.assertEqual(path, decode_path(code, path[0], neighbors))
+
     def test_horizontal_solutions(self):
         """Test that the solver can pick up horizontal solutions."""
         self.assertIn(
@@ -214,6 +276,12 @@ class BoggleTest(unittest.TestCase):
         self.assertRaises(TypeError, BoggleSolver, {"TIN"}, "3")
         self.assertRaises(ValueError, BoggleSolver, {"CAN"}, -1)
 
+        class AccentedBoggleSolver(BoggleSolver):
+            """Boggle solver substituting a letter which is not A to Z."""
+            SUBSTITUTIONS = {"TH": "Ø"}
+
+        self.assertRaises(ValueError, AccentedBoggleSolver, {"THE"})
+
     def test_solve_exceptions(self):
         """Test all exceptions that can be raised with solve parameters."""
         self.assertRaises(TypeError, self.solver.solve, 1)
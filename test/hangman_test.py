@@ -22,6 +22,20 @@ class HangmanTest(unittest.TestCase):
         solver = HangmanSolver({"ROUND", "ROOTS", "SOUND", "ABOUT"})
         self.assertEqual({"ABOUT"}, solver.solve("##O##", "R"))
 
+    def test_add_word(self):
+        """Test words added after loading are used for solving."""
+        solver = HangmanSolver(["ROUND", "SOUND"])
+        solver.add_word("ROUTE")
+        solver.add_words(["ROOT", "ROUTS"])
+        self.assertEqual({"ROUND", "ROUTE", "ROUTS"}, solver.solve("ROU##", ""))
+        self.assertEqual({"ROOT"}, solver.solve("R##T", ""))
+        self.assertEqual({"ROUTE", "ROUTS"}, solver.lookup(5, "T", 3))
+        solver.add_word("ROUGE")
+        self.assertEqual({"ROUGE", "ROUTE"}, solver.lookup(5, "E", 4))
+        self.assertEqual({"ROUND", "ROUGE", "ROUTE", "ROUTS"}, solver.solve("ROU##", ""))
+        solver.clear_words()
+        self.assertEqual(set(), solver.solve("ROU##", ""))
+
     def test_basic(self):
         """Basic test."""
         self.assertEqual(
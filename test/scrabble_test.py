@@ -1,5 +1,7 @@
 """Test module for the scrabble module."""
 
+import os
+import tempfile
 import unittest
 from wordsolver import ScrabbleSolver, EMPTY_STANDARD
 
@@ -41,6 +43,27 @@ class ScrabbleTest(unittest.TestCase):
         solutions = solver.solve(EMPTY_STANDARD, ["A", "B", "C", "D", "E", "F"])
         self.assertEqual(12, len(solutions))
 
+    def test_letters_only(self):
+        """Test only words made of the letters A to Z are loaded."""
+        solver = ScrabbleSolver(["EA", "ÉA", "E-A"])
+        solutions = solver.solve(EMPTY_STANDARD, ["E", "A", "É", "-"])
+        self.assertEqual({"EA"}, {word for word, *_ in solutions})
+
+    def test_from_file_cache(self):
+        """Test the trie saved when loading from a file is reused."""
+        with tempfile.TemporaryDirectory() as directory:
+            filename = os.path.join(directory, "words.txt")
+            with open(filename, "w") as file_text:
+                file_text.write("cat\nDOG\nit's")
+            rack = ["C", "A", "T", "D", "O", "G"]
+            solutions = ScrabbleSolver(filename).solve(EMPTY_STANDARD, rack)
+            self.assertTrue(os.path.exists(filename + ScrabbleSolver.CACHE_SUFFIX))
+            self.assertEqual(
+                solutions,
+                ScrabbleSolver(filename).solve(EMPTY_STANDARD, rack)
+            )
+            self.assertEqual(12, len(solutions))
+
     def test_blanks(self):
         """Test words can be found without blanks."""
         solutions = self.solver.solve(self.board, ["#", "#", "T"])
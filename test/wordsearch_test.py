@@ -49,6 +49,23 @@ class WordSearchTest(unittest.TestCase):
         for solution in solutions:
             self.assertIn(solution, correct)
 
+    def test_add_word(self):
+        """Test words added after loading are searched for."""
+        solver = WordSearchSolver(["HELLO"])
+        solver.add_word("HI")
+        self.assertEqual([('HI', (3, 0), (4, 0))], solver.solve([list("XXXHI")], ["E"]))
+        solver.clear_words()
+        solver.add_word("XH")
+        self.assertEqual([('XH', (2, 0), (3, 0))], solver.solve([list("XXXHI")], ["E"]))
+
+    def test_add_word_end_of_slice(self):
+        """Test words added after loading are found at the end of slices
+        longer than the words loaded."""
+        solver = WordSearchSolver(["HELLO"])
+        solver.add_word("HI")
+        solutions = solver.solve([list("XXXXXXXHI"), list("XXXXXXXXX")])
+        self.assertEqual([('HI', (7, 0), (8, 0))], solutions)
+
     def test_basic(self):
         """Basic test."""
         sols = {
@@ -0,0 +1,98 @@
+"""Test module for the wordtools module."""
+
+import random
+import unittest
+from itertools import product
+from wordsolver import wordtools
+
+
+def letter_indices(word):
+    """Returns the letter indices of the word, 0 for "A" to 25 for "Z"."""
+    return [ord(letter) - ord("A") for letter in word]
+
+
+def random_words(rng, letters, max_length, count):
+    """Returns a list of random words made of the given letters."""
+    return [
+        "".join(rng.choice(letters) for _ in range(rng.randint(1, max_length)))
+        for _ in range(count)
+    ]
+
+
+class WordToolsTest(unittest.TestCase):
+    """Class for testing the wordtools module."""
+
+    def test_double_array_terminals(self):
+        """Test the terminals of a double-array trie are the words added."""
+        rng = random.Random(0)
+        for _ in range(200):
+            words = random_words(rng, "ABCDEZ", 5, rng.randint(1, 30))
+            trie = wordtools.WordArray()
+            trie.set_words(words)
+            self.assertEqual(set(words), set(trie.terminals.values()))
+            for state, word in trie.terminals.items():
+                self.assertEqual(state, trie.follow(letter_indices(word)))
+                self.assertTrue(trie.is_terminal[state])
+            self.assertEqual(len(trie.terminals), int(trie.is_terminal.sum()))
+
+    def test_double_array_prefixes(self):
+        """Test follow accepts exactly the prefixes of the words added."""
+        rng = random.Random(1)
+        for _ in range(100):
+            words = random_words(rng, "ABCD", 4, rng.randint(1, 12))
+            trie = wordtools.WordArray()
+            trie.set_words(words)
+            prefixes = {word[:end] for word in words for end in range(len(word) + 1)}
+            for length in range(6):
+                for letters in product("ABCD", repeat=length):
+                    text = "".join(letters)
+                    self.assertEqual(
+                        text in prefixes,
+                        trie.follow(letter_indices(text)) != -1,
+                        (words, text)
+                    )
+
+    def test_double_array_occupied_slot(self):
+        """Test a state is never placed over one already in the trie."""
+        trie = wordtools.WordArray()
+        trie.set_words(["ED", "D"])
+        self.assertEqual({"ED", "D"}, set(trie.terminals.values()))
+        self.assertEqual(-1, trie.follow(letter_indices("DD")))
+
+    def test_double_array_letters_only(self):
+        """Test words which are not made of the letters A to Z are ignored."""
+        trie = wordtools.WordArray()
+        trie.set_words(["CAT", "ÉTÉ", "DON'T", "cat", ""])
+        self.assertEqual(["CAT"], list(trie.terminals.values()))
+        self.assertEqual(-1, trie.follow([wordtools.LETTER_COUNT]))
+
+    def test_split_words(self):
+        """Test words are split from text as with the word pattern."""
+        self.assertEqual(["CAT", "DOG"], wordtools.split_words("CAT\nDOG\n"))
+        self.assertEqual(
+            ["DON'T", "ÉTÉ", "A1B", "CAT"],
+            wordtools.split_words("DON'T, ÉTÉ; A1B\r\n CAT.")
+        )
+        self.assertEqual([], wordtools.split_words(""))
+
+    def test_tree_clear_words(self):
+        """Test all words are removed from a tree when cleared."""
+        tree = wordtools.WordTree()
+        for word in ("CAT", "CAR", "DOG"):
+            tree.add_word(word)
+        tree.clear_words()
+        self.assertEqual({}, tree.root.children)
+        self.assertEqual(set(), tree.word_set)
+        tree.add_word("CAT")
+        self.assertEqual("CAT", tree.root.get_child("C").get_child("A").get_child("T").my_word)
+        self.assertIsNone(tree.root.get_child("D"))
+
+    def test_hash_lookup(self):
+        """Test words are looked up by length, letter and position."""
+        table = wordtools.WordHash()
+        table.add_words(["CAT", "COT", "DOG", "ÉTÉ"])
+        table.add_word("CUT")
+        self.assertEqual({"CAT", "COT", "CUT"}, table.lookup(3, "C", 0))
+        self.assertEqual({"ÉTÉ"}, table.lookup(3, "É", 2))
+        self.assertEqual(set(), table.lookup(4, "C", 0))
+        self.assertEqual(set(), table.lookup(3, "CA", 0))
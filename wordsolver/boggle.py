@@ -3,16 +3,17 @@
     Boggle board.
 """
 
+import os
 import re
 
 from collections import defaultdict
 from itertools import product
-from pythonds.basic.stack import Stack
+import numpy as np
 
 from wordsolver import wordtools
 
 
-class BoggleSolver(wordtools.WordTree):
+class BoggleSolver(wordtools.WordArray):
     """
         Class for solving a Boggle board.
 
@@ -21,23 +22,41 @@ class BoggleSolver(wordtools.WordTree):
             solving. The value for each word is a list of all possible
             board paths to attain that word. A board path is a list
             of board co-ordinates (x, y). The values of words that
-            are not attainable on the board are empty lists.
+            are not attainable on the board are empty lists. Paths are
+            only recorded when solving with_positions.
         > substitutions (dict) - mapping for swapping sub-strings in
             words for a single character substitution.
-            e.g. substitute = {"QU" : "Q"}. Needs to be all in caps.
+            e.g. substitute = {"QU" : "Q"}. Needs to be all in caps, and
+            each substitution must be a single letter "A" to "Z".
+        > terminals (dict) - keys are the trie states which complete a
+            word, values are the words with substitutions reversed,
+            ready to be returned by solve
+        > substitution_pairs (dict) - the (sub-string, replacement) pairs
+            used by _apply_substitute, keyed by its 'reverse' argument
     """
 
     SUBSTITUTIONS = {"QU": "Q"}
+    CACHE_SUFFIX = ".trie.npz"
 
     def __init__(self, collection, min_length=3):
         super().__init__()
+        self._validate_substitutions(self.SUBSTITUTIONS)
+        self.substitution_pairs = {
+            False: tuple(self.SUBSTITUTIONS.items()),
+            True: tuple((new, old) for old, new in self.SUBSTITUTIONS.items())
+        }
         self._setup(collection, min_length)
         self.word_paths = defaultdict(list)
 
     def _setup(self, collection, min_length):
         """
             Upload the Dictionary words from 'collection'. When solving,
-            the words file will be used for finding words.
+            the words file will be used for finding words. Only words made
+            of the letters "A" to "Z", once upper cased and substituted,
+            are uploaded, other words are ignored. If 'collection'
+            is a filename, the trie built is saved alongside the file
+            (with the CACHE_SUFFIX appended) and is loaded instead of
+            being rebuilt, until the file is modified.
 
             Parameters:
             > collection (list/set/str) - can either be a list/set of strings
@@ -46,11 +65,32 @@ class BoggleSolver(wordtools.WordTree):
         """
         self._validate_min_length(min_length)
         self.clear_words()
-        for word in self._validate_collection(collection):
-            if (not word.isalpha() or len(word) < min_length):
-                continue
-            substituted = self._apply_substitute(word.upper(), reverse=False)
-            self.add_word(substituted)
+
+        # Load the trie saved from a previous build of the same file
+        if isinstance(collection, str):
+            cache_filename = collection + self.CACHE_SUFFIX
+            cache_key = self._cache_key(collection, min_length)
+            if self.load(cache_filename, cache_key):
+                return
+
+        # Substitute the words joined into one string, so the pattern is
+        # run once rather than once per word
+        substitutions = self.SUBSTITUTIONS
+        text = "\n".join([
+            word for word in self._validate_collection(collection)
+            if word.isalpha() and len(word) >= min_length
+        ]).upper()
+        if substitutions:
+            pattern = re.compile("|".join(
+                map(re.escape, sorted(substitutions, key=len, reverse=True))
+            ))
+            text = pattern.sub(lambda match: substitutions[match.group(0)], text)
+        self.set_words([word for word in text.split() if wordtools.is_letters(word)])
+        words = self._apply_substitute("\n".join(self.terminals.values()))
+        self.terminals = dict(zip(self.terminals, words.split("\n")))
+
+        if isinstance(collection, str):
+            self.save(cache_filename, cache_key)
 
     def solve(self, board, with_positions=False):
         """
@@ -58,8 +98,8 @@ class BoggleSolver(wordtools.WordTree):
             all possible words starting at that position.
 
             Parameters:
-            > board (list) - 2d matrix representing a Boggle board, all
-                entries in caps
+            > board (list/np.array) - 2d matrix representing a Boggle
+                board, all entries in caps
             > with_positions (bool) - whether positions of the letters forming
                 the words should be added to the solution
 
@@ -69,71 +109,123 @@ class BoggleSolver(wordtools.WordTree):
         """
         board = self._validate_board(board, with_positions)
         self.word_paths = defaultdict(list)
-        for row, col in product(range(len(board)), range(len(board[0]))):
-            self._iteration(board, row, col)
+        codes = self._encode_board(board)
+        height, width = codes.shape
+        if (height, width) == (4, 4):
+            neighbors = ADJ_4X4
+        else:
+            neighbors = self._build_neighbors(height, width)
+        paths_of_state = defaultdict(list)
+        for start in range(height * width):
+            for state, code in self._iteration(codes, neighbors, *divmod(start, width)):
+                paths_of_state[state].append((code, start))
+        words_of_length = defaultdict(list)
+        for state, paths in paths_of_state.items():
+            word = self.terminals[state]
+            if with_positions:
+                self.word_paths[word] = [
+                    [divmod(index, width) for index in decode_path(code, start, neighbors)]
+                    for code, start in paths
+                ]
+            words_of_length[len(word)].append(word)
+
+        # Order the words from the longest, by their length buckets
+        words = [
+            word for length in sorted(words_of_length, reverse=True)
+            for word in words_of_length[length]
+        ]
         if with_positions:
-            return sorted(self.word_paths.items(), key=lambda x: -len(x[0]))
-        return sorted(self.word_paths.keys(), key=len, reverse=True)
+            return [(word, self.word_paths[word]) for word in words]
+        return words
 
     def _apply_substitute(self, word, reverse=True):
         """If reverse is True, replace any single character
         substitutions in word with the sub-string substitution, found in
         self.SUBSTITUTIONS. If reverse is False, replace any sub-strings
         in word with the single character substitution."""
-        for item in self.SUBSTITUTIONS.items():
-            word = word.replace(item[reverse], item[not reverse])
+        for old, new in self.substitution_pairs[reverse]:
+            word = word.replace(old, new)
         return word
 
-    def _iteration(self, board, row, col):
+    def _iteration(self, board, neighbors, row, col):
         """
-            Main iterative process. This method adds all possible board
-            paths to self.word_paths, starting at position (row, col).
+            Main iterative process. This method finds all possible board
+            paths forming words, starting at position (row, col).
             The iterative process works as follows:
             1) starts with the path [(row, col)]
             2) checks all possible additions from the end of the path
-            3) if an addition forms a word, the path is appended to the
-            corresponding list in self.word_paths
+            3) if an addition forms a word, the trie state and path are
+            recorded
             4) repeat from 2) until all possiblities from that branch
             have been exhausted
+
+            The board is an array of letter indices, see _encode_board,
+            and neighbors is the adjacency table, see _build_neighbors.
+            Only the board and trie are read, so each starting position
+            is independent and the results are merged by the caller.
+
+            Returns:
+            > (list) - (state, code) pairs for each word found, state
+                being the trie state of the word and code being the path
+                forming it, packed as described in decode_path
         """
-        first_node = self.root.get_child(board[row][col])
-        if not first_node:
-            return
-        stack = Stack()
-        stack.push((first_node, [(row, col)]))
-        while not stack.isEmpty():
-            current = stack.pop()
-            for (adj_row, adj_col) in self._get_adjacent(board, current[1]):
-                adj_node = current[0].get_child(board[adj_row][adj_col])
-                adj_path = current[1] + [(adj_row, adj_col)]
-                if not adj_node:
-                    continue
-                if adj_node.my_word:
-                    true_word = self._apply_substitute(adj_node.my_word)
-                    self.word_paths[true_word].append(adj_path)
-                stack.push((adj_node, adj_path))
+        board_flat = memoryview(board.ravel())
+        base, check = memoryview(self.base), memoryview(self.check)
+        index = row * board.shape[1] + col
+        first_state = base[0] + board_flat[index]
+        hits = []
+        if check[first_state] == 0:
+            _search(
+                board_flat, base, check, memoryview(self.is_terminal),
+                neighbors, first_state, index, 1 << index, 1, hits
+            )
+        return hits
 
     @staticmethod
-    def _get_adjacent(board, path):
+    def _build_neighbors(height, width):
         """
-            This method finds all possible candidate co-ordinates for
-            additions to a path.
+            Builds the adjacency table of a board with the given
+            dimensions.
 
             Parameters:
-            > board (list) - 2d matrix representing a Boogle Board
-            > path (list) - board path
+            > height (int) - number of rows of the board
+            > width (int) - number of columns of the board
 
             Returns:
-            > (list) - all board co-ordinates (x, y) which are adjacent
-                to the last co-ordinate in path and are also not in path
+            > (tuple) - for each flat board index (row * width + col), a
+                tuple of the flat indices of the adjacent co-ordinates,
+                in ascending order
         """
-        adjacent = []
-        row_range = max(0, path[-1][0]-1), min(len(board), path[-1][0]+2)
-        col_range = max(0, path[-1][1]-1), min(len(board[0]), path[-1][1]+2)
-        for adj_row, adj_col in product(range(*row_range), range(*col_range)):
-            if (adj_row, adj_col) not in path:
-                adjacent.append((adj_row, adj_col))
-        return adjacent
+        neighbors = []
+        for row, col in product(range(height), range(width)):
+            row_range = max(0, row-1), min(height, row+2)
+            col_range = max(0, col-1), min(width, col+2)
+            neighbors.append(tuple(
+                adj_row * width + adj_col
+                for adj_row, adj_col in product(range(*row_range), range(*col_range))
+                if (adj_row, adj_col) != (row, col)
+            ))
+        return tuple(neighbors)
+
+    def _cache_key(self, filename, min_length):
+        """Returns the key identifying a trie built from the words file
+        'filename', which changes if the file is modified."""
+        stat = os.stat(filename)
+        return "%i:%i:%i:%r" % (
+            stat.st_mtime_ns, stat.st_size, min_length,
+            sorted(self.SUBSTITUTIONS.items())
+        )
+
+    @staticmethod
+    def _encode_board(board):
+        """Returns the board as an int8 array of letter indices, 0 for
+        "A" to 25 for "Z". Tiles which are not letters are given the
+        index wordtools.LETTER_COUNT, which is never a trie transition."""
+        ordinals = np.array(
+            [[ord(letter) for letter in element] for element in board],
+            dtype=np.int32
+        )
+        return wordtools.LETTER_LUT[np.minimum(ordinals, 255)]
 
     @staticmethod
     def _validate_collection(collection):
@@ -147,7 +239,7 @@ class BoggleSolver(wordtools.WordTree):
         if isinstance(collection, str):
             with open(collection, "r") as file_text:
                 text = file_text.read()
-            return re.findall(r"[\w']+", text)
+            return wordtools.split_words(text)
 
         # Else an incorrect type has been received
         raise TypeError(
@@ -155,6 +247,19 @@ class BoggleSolver(wordtools.WordTree):
             "Expected list, set or str, received '%s'." % type(collection).__name__
         )
 
+    @staticmethod
+    def _validate_substitutions(substitutions):
+        """Validate the SUBSTITUTIONS mapping."""
+
+        # Check that each substitution is a letter the trie can hold
+        for old, new in substitutions.items():
+            if len(new) != 1 or not wordtools.is_letters(new):
+                raise ValueError(
+                    "invalid value for 'SUBSTITUTIONS'. "
+                    "Cannot substitute '%s' with '%s', substitutions must be "
+                    "a single letter A to Z." % (old, new)
+                )
+
     @staticmethod
     def _validate_min_length(min_length):
         """Validate the min_length parameter."""
@@ -176,6 +281,10 @@ class BoggleSolver(wordtools.WordTree):
     def _validate_board(self, board, with_positions):
         """Validate the board parameter. Returns the board."""
 
+        # Convert a 2d numpy array of letters to a list of lists
+        if isinstance(board, np.ndarray) and board.ndim == 2:
+            board = board.tolist()
+
         # Check board is a list
         if not isinstance(board, list):
             raise TypeError(
@@ -183,50 +292,107 @@ class BoggleSolver(wordtools.WordTree):
                 "Expected list, received '%s'." % type(board).__name__
             )
 
-        # Check board is a list of lists
-        element_lengths = set()
+        # Check each element is a list of single letters, all the same size,
+        # substituting the tiles in the same pass
         for index, element in enumerate(board):
             if not isinstance(element, list):
                 raise TypeError(
                     "invalid value for 'board' parameter at index %i. "
                     "Expected list, received '%s'." % (index, type(element).__name__)
                 )
-            element_lengths.add(len(element))
-
-        # Check all lists are the same size
-        if len(element_lengths) > 1:
-            raise ValueError(
-                "invalid value for 'board' parameter. "
-                "Not all rows are the same size."
-            )
-
-        # Check each element in the lists are strings
-        for index, element in enumerate(board):
+            if len(element) != len(board[0]):
+                raise ValueError(
+                    "invalid value for 'board' parameter. "
+                    "Not all rows are the same size."
+                )
+            row = []
             for tile in element:
                 if not isinstance(tile, str):
                     raise TypeError(
                         "invalid value for 'board' parameter at index %i. "
                         "Not all elements are str, found '%s'" % (index, type(tile).__name__)
                     )
-            board[index] = [
-                self._apply_substitute(tile.upper(), reverse=False)
-                for tile in element
-            ]
-
-        # Check that each element of board is a single letter
-        for index, element in enumerate(board):
-            for letter in element:
+                letter = self._apply_substitute(tile.upper(), reverse=False)
                 if len(letter) != 1:
                     raise ValueError(
                         "invalid value for 'board' parameter at index %i. "
-                        "Cannot convert '%s' into a letter." % (index, letter)
+                        "Cannot convert '%s' into a letter." % (index, tile)
                     )
+                row.append(letter)
+            board[index] = row
 
         # Check the with_positions paramter
         if not isinstance(with_positions, bool):
             raise TypeError(
                 "invalid value for 'with_positions' parameter. "
-                "Expected bool, received '%s'." % type(board).__name__
+                "Expected bool, received '%s'." % type(with_positions).__name__
             )
 
         return board
+
+
+# Adjacency table of the standard 4x4 Boggle board
+ADJ_4X4 = BoggleSolver._build_neighbors(4, 4)
+
+
+def decode_path(code, start, neighbors):
+    """
+        Decodes a path packed into an int. The code begins with a 1 bit,
+        followed by 3 bits for each step of the path, giving the position
+        of the next index within the adjacency table entry of the
+        current index.
+
+        Parameters:
+        > code (int) - the packed path
+        > start (int) - flat board index of the start of the path
+        > neighbors (tuple) - adjacency table the path was packed with
+
+        Returns:
+        > (list) - flat board indices of the path
+    """
+    path = [start]
+    for shift in range(code.bit_length() - 4, -1, -3):
+        path.append(neighbors[path[-1]][code >> shift & 7])
+    return path
+
+
+def _search(board, base, check, is_terminal, neighbors, state, index,
+            visited, code, hits):
+    """
+        Depth first search of the board from the end of a path, which
+        has the flat board index 'index' and trie state 'state'. Only
+        arrays and ints are used, words and co-ordinates are resolved by
+        the caller.
+
+        Parameters:
+        > board (memoryview) - flat board of letter indices
+        > base, check, is_terminal (memoryview) - the WordArray arrays
+        > neighbors (tuple) - adjacency table of flat board indices
+        > state (int) - trie state of the path
+        > index (int) - flat board index of the end of the path
+        > visited (int) - bitmask of the flat board indices in the path
+        > code (int) - the path, packed as described in decode_path
+        > hits (list) - the (state, code) pairs of each word found are
+            appended to this list
+
+        Words are recorded for all additions before descending, and
+        additions are descended in reverse order, so paths are found in
+        the same order as a stack based search.
+    """
+    offset = base[state]
+    children = []
+    for step, adj_index in enumerate(neighbors[index]):
+        if visited >> adj_index & 1:
+            continue
+        adj_state = offset + board[adj_index]
+        if check[adj_state] != state:
+            continue
+        adj_code = code << 3 | step
+        if is_terminal[adj_state]:
+            hits.append((adj_state, adj_code))
+        children.append((adj_state, adj_index, adj_code))
+    for adj_state, adj_index, adj_code in reversed(children):
+        _search(
+            board, base, check, is_terminal, neighbors, adj_state, adj_index,
+            visited | 1 << adj_index, adj_code, hits
+        )
@@ -4,13 +4,16 @@
 """
 
 from collections import defaultdict
-import re
 from string import ascii_uppercase
-from itertools import product
+import numpy as np
 from wordsolver import wordtools
 
 
-class HangmanSolver(wordtools.WordHash):
+# Letters which can be guessed
+UPPERCASE = frozenset(ascii_uppercase)
+
+
+class HangmanSolver():
     """
         Class for solving a game of Hangman.
 
@@ -18,21 +21,32 @@ class HangmanSolver(wordtools.WordHash):
 
         Attributes:
         > _candidates (set) - list of words that satify the criteria
+        > _candidate_masks (np.array) - bitmasks of the letters "A" to "Z"
+            in each of the candidates
         > _length (int) - length of the solution
         > _correct (dict) - mapping of correct letters
         > _incorrect (iterable) - letters which are not in the word
         > _words_of_length (dict) - keys are word lengths, values are all words
             added with that length
+        > _word_table (dict) - keys are word lengths, values are tuples
+            (words, codes, masks) of arrays of the words added with that
+            length: the words, their letter indices (see
+            wordtools.LETTER_LUT) and bitmasks of the letters "A" to "Z"
+            in each word
+        > _stale_lengths (set) - word lengths whose word table is out of
+            date with the words added, rebuilt when next read
     """
 
     def __init__(self, filename):
-        super().__init__()
         self.candidates = set()
+        self.candidate_masks = np.zeros(0, dtype=np.uint32)
         self.length = 0
         self.correct = defaultdict(set)
         self.incorrect = defaultdict(set)
         self.attempt = ""
         self.words_of_length = defaultdict(set)
+        self.word_table = dict()
+        self.stale_lengths = set()
         self._upload_words(filename)
 
     def _upload_words(self, collection):
@@ -40,11 +54,65 @@ class HangmanSolver(wordtools.WordHash):
         solving, the words from this text file will be used for spell
         checking."""
         self.clear_words()
-        for word in self._validate_collection(collection):
-            if not word.isalpha():
-                continue
+        self.add_words([
+            word for word in self._validate_collection(collection)
+            if word.isalpha()
+        ])
+
+    def add_word(self, word):
+        """Adds the word to the words used for solving. The word table
+        for its length is only rebuilt when it is next read."""
+        self.words_of_length[len(word)].add(word)
+        self.stale_lengths.add(len(word))
+
+    def add_words(self, words):
+        """Adds all the given words to the words used for solving. This
+        is the bulk path: the word table is rebuilt once for each length
+        of the words added."""
+        for word in words:
             self.add_word(word)
-            self.words_of_length[len(word)].add(word)
+        for length in list(self.stale_lengths):
+            self._get_word_table(length)
+
+    def clear_words(self):
+        """Clears the all words used for solving."""
+        self.words_of_length = defaultdict(set)
+        self.word_table = dict()
+        self.stale_lengths = set()
+
+    def _get_word_table(self, length):
+        """Returns the word table for the words of the given length,
+        rebuilding it first if words of that length were added since it
+        was built, or None if no words of that length were added."""
+        if length in self.stale_lengths:
+            self.word_table[length] = self._build_word_table(self.words_of_length[length])
+            self.stale_lengths.discard(length)
+        return self.word_table.get(length)
+
+    @staticmethod
+    def _build_word_table(words):
+        """Returns the tuple (words, codes, masks) of arrays for the given
+        words, which all have the same length, see _word_table."""
+        words = np.array(sorted(words))
+        ordinals = words.reshape(-1, 1).view(np.uint32)
+        codes = wordtools.LETTER_LUT[np.minimum(ordinals, 255)]
+        masks = np.bitwise_or.reduce(
+            np.uint32(1) << codes.astype(np.uint32), axis=1
+        )
+        return words, codes, masks
+
+    def lookup(self, length, letter, position):
+        """Returns the set of added words with the given length and with
+        the given letter in the given position. The words are read from
+        the word table."""
+        table = self._get_word_table(length)
+        if table is None or len(letter) != 1:
+            return set()
+        if not 0 <= position < length:
+            return set()
+        words = table[0]
+        ordinals = words.reshape(-1, 1).view(np.uint32)
+        return set(words[ordinals[:, position] == ord(letter)].tolist())
 
     def solve(self, attempt, incorrect):
         """
@@ -79,11 +147,16 @@ class HangmanSolver(wordtools.WordHash):
         attempt, wrong = self._validate_parameters(attempt, wrong)
         self._reduce_candidates(attempt, wrong)
 
-        tally = dict.fromkeys(set(ascii_uppercase) - self.incorrect.keys(), 0)
+        # Count the candidates containing each letter from their bitmasks
+        shifts = np.arange(wordtools.LETTER_COUNT, dtype=np.uint32)
+        counts = ((self.candidate_masks[:, None] >> shifts) & 1).sum(axis=0)
 
-        for candidate in self.candidates:
-            for letter in set(candidate) & tally.keys():
-                tally[letter] += 1/len(self.candidates)
+        total = len(self.candidates)
+        tally = {
+            letter: int(count) / total if total else 0
+            for letter, count in zip(ascii_uppercase, counts)
+            if letter not in self.incorrect
+        }
 
         return sorted(tally.items(), key=lambda x: -x[1])
 
@@ -97,69 +170,57 @@ class HangmanSolver(wordtools.WordHash):
             > wrong (iterable) - wrong letters
         """
         self.length = len(attempt)
-        self.candidates = self.words_of_length[self.length]
 
-        self.correct.clear()
-        self.incorrect.clear()
+        correct, incorrect = self.correct, self.incorrect
+        correct.clear()
+        incorrect.clear()
 
+        positions = frozenset(range(self.length))
         for pos, let in enumerate(attempt):
-            if not let in ascii_uppercase:
+            if let not in UPPERCASE:
                 continue
-            self.correct[let].add(pos)
-            self.incorrect[let] |= (set(range(self.length)) - {pos})
+            correct[let].add(pos)
+            incorrect[let] |= positions - {pos}
 
-        for pos, let in product(range(self.length), wrong):
-            if not let in ascii_uppercase:
+        for let in wrong:
+            if let not in UPPERCASE:
                 continue
-            self.incorrect[let].add(pos)
-
-        self._filter_correct_letters(self.correct)
-        self._filter_incorrect_letters(self.incorrect)
-
-    def _filter_correct_letters(self, requirements):
-        """
-            Filters out all candidates in self.candidates which do not reach
-            the specification.
+            incorrect[let] |= positions
 
-            The specification is that for each (letter, positions) pair in
-            'requirements', a candidate must have the letter at all the indicies
-            in positions.
+        if self._get_word_table(self.length) is None:
+            self.candidates = set()
+            self.candidate_masks = np.zeros(0, dtype=np.uint32)
+            return
 
-            Parameters:
-            > requirements (dict) - mapping letters (str) and positions (list)
-        """
-        self.candidates = self.candidates.intersection(
-            *[
-                self.lookup(self.length, let, pos)
-                for let, pos in self._yield_requirements(requirements)
-            ]
-        )
+        words, _, masks = self.word_table[self.length]
+        keep = self._filter_candidates(wrong)
+        self.candidates = set(words[keep].tolist())
+        self.candidate_masks = masks[keep]
 
-    def _filter_incorrect_letters(self, requirements):
+    def _filter_candidates(self, wrong):
         """
-            Filters out all candidates in self.candidates which do not reach
-            the specification.
-
-            The specification is that for each (letter, positions) pair in
-            'requirements', a candidate must not have the letter in any of the
-            indicies in positions.
+            Returns a bool array of whether each word in the word table
+            for self.length meets the requirements in self.correct and
+            self.incorrect. Words with any of the 'wrong' letters are
+            rejected using the letter bitmasks of the words, the other
+            requirements are checked on the letter indices of the words.
 
             Parameters:
-            > requirements (dict) - mapping letters (str) and positions (list)
+            > wrong (iterable) - wrong letters
         """
-        self.candidates = self.candidates.difference(
-            *[
-                self.lookup(self.length, let, pos)
-                for let, pos in self._yield_requirements(requirements)
-            ]
-        )
-
-    @staticmethod
-    def _yield_requirements(requirements):
-        """Yields the letter and positions in requirements."""
-        for letter, positions in requirements.items():
-            for position in positions:
-                yield (letter, position)
+        _, codes, masks = self.word_table[self.length]
+        wrong = UPPERCASE.intersection(wrong)
+        wrong_mask = sum(1 << (ord(let) - ord("A")) for let in wrong)
+        keep = (masks & wrong_mask) == 0
+        for let, positions in self.correct.items():
+            index = ord(let) - ord("A")
+            keep &= (codes[:, sorted(positions)] == index).all(axis=1)
+        for let, positions in self.incorrect.items():
+            if let in wrong:
+                continue
+            index = ord(let) - ord("A")
+            keep &= (codes[:, sorted(positions)] != index).all(axis=1)
+        return keep
 
     @staticmethod
     def _validate_collection(collection):
@@ -173,7 +234,7 @@ class HangmanSolver(wordtools.WordHash):
         if isinstance(collection, str):
             with open(collection, "r") as file_text:
                 text = file_text.read()
-            return re.findall(r"[\w']+", text.upper())
+            return wordtools.split_words(text.upper())
 
         # Else an incorrect type has been received
         raise TypeError(
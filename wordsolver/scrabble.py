@@ -3,9 +3,10 @@
     words that can be played on a Scrabble board.
 """
 
-import re
+import os
+from collections import Counter
+from operator import itemgetter
 from string import ascii_lowercase, ascii_uppercase
-from collections import defaultdict
 import numpy as np
 
 from wordsolver import wordtools
@@ -36,6 +37,15 @@ PREMIUM_STANDARD = [
     ["T", "*", "*", "d", "*", "*", "*", "T", "*", "*", "*", "d", "*", "*", "T"]
 ]
 
+# Lane of each tile in the minor score tables, 0 - 25 for the tiles "A" to
+# "Z" and 26 - 51 for the blanks "a" to "z"
+TILE_LETTERS = ascii_uppercase + ascii_lowercase
+TILE_LANES = {letter: lane for lane, letter in enumerate(TILE_LETTERS)}
+
+# Codes of an encoded board which are not tiles, see _encode_board
+FREE_CODE = -1
+OUTSIDE_CODE = -2
+
 EMPTY_STANDARD = [
     ["*", "*", "*", "*", "*", "*", "*", "*", "*", "*", "*", "*", "*", "*", "*"],
     ["*", "*", "*", "*", "*", "*", "*", "*", "*", "*", "*", "*", "*", "*", "*"],
@@ -55,7 +65,7 @@ EMPTY_STANDARD = [
 ]
 
 
-class ScrabbleSolver(wordtools.WordHash):
+class ScrabbleSolver(wordtools.WordArray):
     """
         Class for solving a Scrabble board.
 
@@ -63,37 +73,70 @@ class ScrabbleSolver(wordtools.WordHash):
         > board (np.array) - 2d matrix representing a Scrabble board,
             entries in caps for normal tiles, lower case for blanks,
             empty spaces can be "", "*" or None
-        > minor (np.array) - 2d matrix of scores obtained from minor
-            words
+        > codes (np.array) - the board encoded as an int8 array, see
+            _encode_board
+        > adjacent (np.array) - 2d bool matrix of the positions which are
+            the centre of the board or have a tile above or below them
+        > minor (np.array) - scores obtained from minor words, of shape
+            (rows, columns, 52), the last axis indexed by the TILE_LANES
+            of the tile placed
+        > allowed (np.array) - same shape as minor, whether the tile can
+            be placed at that position without spelling an invalid minor
+            word
+        > letter_mult (np.array) - 2d matrix of the letter multiplier of
+            each premium square
+        > word_mult (np.array) - 2d matrix of the word multiplier of each
+            premium square
         > rack (str) - letters in the rack, '#' for blanks
+        > tile_values (list) - values of the tiles indexed by their
+            TILE_LANES, followed by 0 for any other letter
         > values (dict) - keys are possible tiles, values are the values
         > premium (list) - 2d matrix representing the premium squares on
             the Scrabble board; '*' : no bonus, 'd' double letter,
             't' : triple letter, 'D' double word, 'T' : triple word
-        > words_of_length (dict) - keys are word lengths, values are all
-            words added with that length
     """
 
+    CACHE_SUFFIX = ".scrabble.trie.npz"
+
     def __init__(self, collection):
         super().__init__()
         self.board = None
+        self.codes = None
+        self.adjacent = None
         self.minor = None
+        self.allowed = None
+        self.letter_mult = None
+        self.word_mult = None
         self.rack = ""
+        self.tile_values = None
         self.values = VALUE_STANDARD
         self.premium = PREMIUM_STANDARD
-        self.words_of_length = defaultdict(set)
         self._setup(collection)
 
     def _setup(self, collection):
         """Upload the Dictionary words from a text file 'filename'. When
         solving, the words from this text file will be used for spell
-        checking."""
+        checking. Only words made of the letters "A" to "Z", once upper
+        cased, are uploaded, other words are ignored. The trie built
+        from a file is saved alongside it (with the CACHE_SUFFIX
+        appended) and is loaded instead of being rebuilt, until the file
+        is modified."""
         self.clear_words()
-        for word in self._validate_collection(collection):
-            if not word.isalpha():
-                continue
-            self.add_word(word)
-            self.words_of_length[len(word)].add(word)
+
+        # Load the trie saved from a previous build of the same file
+        if isinstance(collection, str):
+            cache_filename = collection + self.CACHE_SUFFIX
+            cache_key = self._cache_key(collection)
+            if self.load(cache_filename, cache_key):
+                return
+
+        self.set_words([
+            word for word in self._validate_collection(collection)
+            if wordtools.is_letters(word)
+        ])
+
+        if isinstance(collection, str):
+            self.save(cache_filename, cache_key)
 
     def solve(self, board, rack):
         """
@@ -119,14 +162,20 @@ class ScrabbleSolver(wordtools.WordHash):
         solutions = set()
 
         # Gather horizontal word solutions
-        for word, x, y, score in self._horizontal_solve(matrix, rack):
-            solutions.add((word, x, y, False, score))
+        solutions.update([
+            (word, x, y, False, score)
+            for word, x, y, score in self._horizontal_solve(matrix, rack)
+        ])
 
-        # Gather vertical word solutions
-        for word, y, x, score in self._horizontal_solve(matrix.transpose(), rack):
-            solutions.add((word, x, y, True, score))
+        # Gather vertical word solutions, from a contiguous copy of the
+        # transposed board so its rows are read with unit stride
+        transposed = np.ascontiguousarray(matrix.transpose())
+        solutions.update([
+            (word, x, y, True, score)
+            for word, y, x, score in self._horizontal_solve(transposed, rack)
+        ])
 
-        return sorted(solutions, key=lambda x: x[-1], reverse=True)
+        return sorted(solutions, key=itemgetter(-1), reverse=True)
 
     def get_score(self, board, rack, attempt):
         """
@@ -147,24 +196,24 @@ class ScrabbleSolver(wordtools.WordHash):
         (word, x, y, orientation) = self._validate_attempt(attempt)
 
         if not orientation:
-            self._prepare(np.array(board), rack)
+            self._prepare(board, rack)
         else:
-            self._prepare(np.array(board).transpose(), rack)
+            self._prepare(np.ascontiguousarray(board.transpose()), rack)
             x, y = y, x
 
         placements, adjacent = [], False
         for n in range(len(word)):
-            tile = self._get_tile(x+n, y)
-            if tile.isalpha():
+            code = self._get_code(x+n, y)
+            if code >= 0:
                 adjacent = True
-            elif not tile:
+            elif code == OUTSIDE_CODE:
                 break
-            elif tile == "*":
+            else:
                 if len(placements) == len(self.rack):
                     break
                 placements.append(n)
                 if not adjacent:
-                    adjacent = self._is_vertically_adjacent(x+n, y)
+                    adjacent = bool(self.adjacent[y, x+n])
         else:
             if not adjacent:
                 return -1
@@ -174,8 +223,8 @@ class ScrabbleSolver(wordtools.WordHash):
 
     def _horizontal_solve(self, board, rack):
         """
-            Generator function which yields horizontal word solutions,
-            for the given Scrabble board, using the tiles in 'rack'.
+            Finds the horizontal word solutions for the given Scrabble
+            board, using the tiles in 'rack'.
 
             Parameters:
             > board (list) - 2d matrix representing a Scrabble board, all
@@ -183,59 +232,39 @@ class ScrabbleSolver(wordtools.WordHash):
             > rack (str) - letters of the tiles on the rack, blanks are
                 represented by a "#"
 
-            Yields:
-            > (word, x, y, score)
+            Returns:
+            > (list) - solutions of the form (word, x, y, score)
                 word (str) : the whole main word created
                 x (int) : the x coordinate of the beginning of the word
                 y (int) : the y coordinate of the beginning of the word
                 score (int) : the points gained by creating the word
         """
         self._prepare(board, rack)
-        for x, y in np.ndindex(self.board.shape):
-            for word, score in self._horizontal_solutions(x, y):
-                yield (word, x, y, score)
-
-    def _horizontal_solutions(self, x, y):
-        """
-            Yields the possible words and scores given from placing a
-            word in beginningin the position x, y.
-
-            Parameters
-            > x (int) - x position of the words
-            > y (int) - y position of the words
-
-            Yields:
-            > (word, score) - word: str, score: int
-        """
-
-        # Not interested in positions with a preceding tile to the left
-        if self._get_tile(x-1, y).isalpha():
-            return
-
-        # placements : list of indices of tiles placed since the first
-        # requirements : letter, position pairs, words must have to fit
-        # adjacent : is the current tile stream adjacent to placed tiles
-        placements, requirements, adjacent = [], [], False
-
-        # Streams tiles horizontally from (x, y), yielding all solutions
-        for n in range(self.board.shape[0]):
-            tile = self._get_tile(x+n, y)
-            if tile.isalpha():
-                requirements.append((tile, n))
-            elif requirements or adjacent:
-                words = self._find_words(n, requirements)
-                for word, score in self._yield_solutions(
-                        words, x, y, placements
-                    ):
-                    yield (word, score)
-            if not tile:
-                break
-            elif tile == "*":
-                if len(placements) == len(self.rack):
-                    break
-                placements.append(n)
-                if not adjacent:
-                    adjacent = self._is_vertically_adjacent(x+n, y)
+        trie = (
+            memoryview(self.base), memoryview(self.check),
+            memoryview(self.is_terminal)
+        )
+        counts = [self.rack.count(letter) for letter in ascii_uppercase]
+        counts.append(self.rack.count("#"))
+        rack = (counts, [code for code, count in enumerate(counts[:-1]) if count])
+        rows, columns = self.board.shape
+        solutions = []
+        for y in range(rows):
+            codes = self.codes[y].tolist()
+            adjacent = self.adjacent[y].tolist()
+            allowed = self.allowed[y, :, :wordtools.LETTER_COUNT].tolist()
+            minor = self.minor[y].tolist()
+            letter_mult = self.letter_mult[y].tolist()
+            word_mult = self.word_mult[y].tolist()
+            for x, ends in _scan_row(codes, adjacent, len(self.rack)):
+                row = (
+                    codes[x:], ends, allowed[x:], minor[x:], letter_mult[x:],
+                    word_mult[x:], self.tile_values
+                )
+                hits = []
+                _extend_right(trie, row, rack, 0, 0, 0, (0, 0, 1), [], hits)
+                solutions.extend([(word, x, y, score) for word, score in hits])
+        return solutions
 
     def _yield_solutions(self, words, x, y, placements):
         """
@@ -258,98 +287,115 @@ class ScrabbleSolver(wordtools.WordHash):
             if not rack_tiles:
                 continue
             score = 0
-            placed = [(rack_tiles[n], pos) for n, pos in enumerate(placements)]
-            for let, pos in placed:
-                if not let in self.minor[y][x + pos]:
+            letters = list(word)
+            for let, pos in zip(rack_tiles, placements):
+                lane = TILE_LANES.get(let)
+                if lane is None or not self.allowed[y, x + pos, lane]:
                     break
-                if let.islower():
-                    word = word[:pos] + let + word[pos+1:]
-                score += self.minor[y][x + pos][let]
+                letters[pos] = let
+                score += int(self.minor[y, x + pos, lane])
             else:
+                word = "".join(letters)
                 bingo = (len(placements) == 7)
                 score += self._evaluate_major_score(word, x, y, bingo)
                 yield (word, score)
 
     def _get_minor_scores(self):
-        """Returns the points gained from any vertical words. The return
-        value is a 2d matrix representing positions on self.board. The
-        entries are dicts, keys are possible tiles which can be placed
-        and that position, values are the points earned."""
-        minor_scores = np.full(self.board.shape, dict())
-        for x, y in np.ndindex(self.board.shape):
-            minor_scores[x][y] = {}
-        minor_shape = (self.board.shape[0], self.board.shape[1] + 1)
-        allow_all = dict.fromkeys(ascii_lowercase + ascii_uppercase, 0)
-
-        # Iterate though positions vertically
-        letters, pos = [], ()
-        for x, y in np.ndindex(minor_shape):
-            tile = self._get_tile(x, y)
-            if not tile.isalpha() and pos:
-                ind = letters.index("*")
-                if letters == ["*"]:
-                    minor_scores[pos[1]][pos[0]] = allow_all
+        """Returns the points gained from any vertical words, as the
+        pair of arrays (minor, allowed) described in the class
+        attributes. Positions which are not free, or where no tile can
+        be placed, allow no tiles."""
+        table_shape = self.board.shape + (len(TILE_LANES),)
+        minor_scores = np.zeros(table_shape, dtype=np.int32)
+        allowed = np.zeros(table_shape, dtype=np.bool_)
+        rows, columns = self.board.shape
+
+        # Iterate though positions vertically, collecting the letter
+        # indices of the tiles, blanks counting as the letter they are.
+        # Each column is read as a list ending with OUTSIDE_CODE.
+        indices, pos = [], ()
+        for x in range(columns):
+            column = self.codes[:, x].tolist() + [OUTSIDE_CODE]
+            for y in range(rows + 1):
+                code = column[y]
+                if code < 0 and pos:
+                    ind = indices.index(FREE_CODE)
+                    if indices == [FREE_CODE]:
+                        allowed[pos[1], pos[0]] = True
+                    else:
+                        for lane, score in self._generate_minor_score(
+                                indices, pos[0], pos[1], ind
+                        ):
+                            minor_scores[pos[1], pos[0], lane] = score
+                            allowed[pos[1], pos[0], lane] = True
+                    if code == FREE_CODE:
+                        indices = indices[ind+1:]
+                if code == OUTSIDE_CODE:
+                    indices, pos = [], ()
+                elif code == FREE_CODE:
+                    indices.append(FREE_CODE)
+                    pos = (x, y)
+                elif code < len(TILE_LANES):
+                    indices.append(code % wordtools.LETTER_COUNT)
                 else:
-                    for part in self._generate_minor_score(
-                            letters, pos[0], pos[1], ind
-                    ):
-                        minor_scores[pos[1]][pos[0]].update(part)
-                if tile == "*":
-                    letters = letters[ind+1:]
-            if not tile:
-                letters, pos = [], ()
-            else:
-                letters.append(tile.upper())
-            if tile == "*":
-                pos = (x, y)
-
-        return minor_scores
-
-    def _generate_minor_score(self, letters, x, y, ind):
-        """Yields key-value pairs of letters and the scores given by
-        placing the tile at position x, y, having index ind in the word.
-        """
-        letter_mult = {"d" : 2, "t" : 3}.get(self.premium[y][x], 1)
-        base_value = sum([self.values.get(letter, 0) for letter in letters])
-        base_mult = {"D" : 2, "T" : 3}.get(self.premium[y][x], 1)
-
-        # Get all words
-        requirements = [
-            (let, pos) for pos, let in enumerate(letters) if let != "*"
-        ]
-        words = self._find_words(len(letters), requirements)
-
-        # Yield a solution for each word
-        for letter in {word[ind] for word in words}:
-            letter_value = self.values.get(letter, 0)
-            yield {
-                letter : base_mult * (base_value + letter_mult * letter_value),
-                letter.lower() : base_mult * base_value
-            }
+                    indices.append(len(TILE_LANES))
+
+        return minor_scores, allowed
+
+    def _generate_minor_score(self, indices, x, y, ind):
+        """Yields pairs of the TILE_LANES of the tiles which can be
+        placed at position x, y, having index ind in the word, and the
+        scores given by placing them. 'indices' are the letter indices
+        of the word, len(TILE_LANES) for letters which are not "A" to
+        "Z" and FREE_CODE at index ind."""
+        values = self.tile_values
+        letter_mult = int(self.letter_mult[y, x])
+        base_value = sum([values[index] for index in indices if index != FREE_CODE])
+        base_mult = int(self.word_mult[y, x])
+
+        # Follow the trie through the letters above the free position,
+        # then through each letter and the letters below it
+        above = self.follow(indices[:ind])
+        for index in range(wordtools.LETTER_COUNT):
+            state = self.follow(indices[ind+1:], self.follow([index], above))
+            if state == -1 or not self.is_terminal[state]:
+                continue
+            yield index, base_mult * (base_value + letter_mult * values[index])
+            yield index + wordtools.LETTER_COUNT, base_mult * base_value
 
     def _prepare(self, board, rack):
         """Prepares for calculating scores."""
         self.board = board
-        self.minor = self._get_minor_scores()
+        self.tile_values = [self.values.get(letter, 0) for letter in TILE_LETTERS]
+        self.tile_values.append(0)
+        self.codes = self._encode_board(board)
+        self.adjacent = self._get_adjacent()
+        self.letter_mult = self._get_multipliers({"d" : 2, "t" : 3})
+        self.word_mult = self._get_multipliers({"D" : 2, "T" : 3})
+        self.minor, self.allowed = self._get_minor_scores()
         self.rack = "".join(rack)
 
-    def _find_words(self, length, requirements):
-        """Returns the set of all words of length 'length', meeting the
-        criteria set in the list 'requirements'. For every tuple
-        ("?", n) in 'requirements', the word must contain the letter "?"
-        at index 'n'. If 'requirements' is empty, all words of length
-        'length' are returned."""
-        if not requirements:
-            return self.words_of_length[length]
-        set_list = [self.lookup(length, let, pos) for let, pos in requirements]
-        return set.intersection(*set_list)
-
-    def _is_vertically_adjacent(self, x, y):
-        """Returns whether the given (x, y) position on self.board in
-        on the centre of the board or has a tile above or below it."""
-        if x == (self.board.shape[1]-1)/2 and y == (self.board.shape[0]-1)/2:
-            return True
-        return self._get_tile(x, y-1).isalpha() or self._get_tile(x, y+1).isalpha()
+    def _get_multipliers(self, multipliers):
+        """Returns a 2d int array of the multiplier of each premium
+        square, given the mapping 'multipliers' of premium squares to
+        their multipliers. Other squares have a multiplier of 1."""
+        return np.array([
+            [multipliers.get(square, 1) for square in row]
+            for row in self.premium
+        ], dtype=np.int32)
+
+    def _get_adjacent(self):
+        """Returns a 2d bool array of whether each position on
+        self.board is on the centre of the board or has a tile above or
+        below it."""
+        tiles = self.codes >= 0
+        adjacent = np.zeros_like(tiles)
+        adjacent[1:] |= tiles[:-1]
+        adjacent[:-1] |= tiles[1:]
+        rows, columns = self.codes.shape
+        if rows % 2 and columns % 2:
+            adjacent[rows // 2, columns // 2] = True
+        return adjacent
 
     def _evaluate_major_score(self, word, x, y, bingo):
         """"Returns the points gained for spelling the given word
@@ -359,38 +405,56 @@ class ScrabbleSolver(wordtools.WordHash):
         bingo_bonus = 50 if bingo else 0
         for n, letter in enumerate(word):
             letter_mult = 1
-            if self._get_tile(x+n, y) == "*":
-                letter_mult = {"d" : 2, "t" : 3}.get(self.premium[y][x+n], 1)
-                word_mult *= {"D" : 2, "T" : 3}.get(self.premium[y][x+n], 1)
-            value_total += self.values.get(letter, 0) * letter_mult
+            if self._get_code(x+n, y) == FREE_CODE:
+                letter_mult = int(self.letter_mult[y, x+n])
+                word_mult *= int(self.word_mult[y, x+n])
+            lane = TILE_LANES.get(letter, len(TILE_LANES))
+            value_total += self.tile_values[lane] * letter_mult
         return value_total * word_mult + bingo_bonus
 
-    def _get_tile(self, x, y):
-        """Returns the letter of the tile on the board at position
-        (x, y). If the position is free, '*' is returned. If (x, y)
-        does not exist on the board, "" is returned."""
-        if not (0 <= x < self.board.shape[1] and 0 <= y < self.board.shape[0]):
-            return ""
-        tile = self.board[y][x]
-        if tile in ["", "*", None]:
-            return "*"
-        return tile
+    @staticmethod
+    def _cache_key(filename):
+        """Returns the key identifying a trie built from the words file
+        'filename', which changes if the file is modified."""
+        stat = os.stat(filename)
+        return "%i:%i" % (stat.st_mtime_ns, stat.st_size)
+
+    def _get_code(self, x, y):
+        """Returns the code of the tile on the board at position (x, y),
+        see _encode_board. If (x, y) does not exist on the board,
+        OUTSIDE_CODE is returned."""
+        if not (0 <= x < self.codes.shape[1] and 0 <= y < self.codes.shape[0]):
+            return OUTSIDE_CODE
+        return self.codes[y, x]
+
+    @staticmethod
+    def _encode_board(board):
+        """Returns the board as an int8 array of tile codes. Tiles are
+        given their TILE_LANES, free positions are given FREE_CODE and
+        any other letters, which cannot be part of a word, are given
+        len(TILE_LANES)."""
+        codes = dict(TILE_LANES, **{"*": FREE_CODE})
+        return np.array([
+            [codes.get(tile, len(TILE_LANES)) for tile in row]
+            for row in board.tolist()
+        ], dtype=np.int8)
 
     @staticmethod
     def _get_rack_tiles(rack, word, placements):
         """Returns the word tiles used to place the word."""
-        placed_tiles = [word[pos] for pos in placements]
-        rack_tiles = ""
-        for letter in placed_tiles:
-            if letter in rack:
-                rack = rack.replace(letter, "", 1)
-                rack_tiles += letter
-            elif "#" in rack:
-                rack = rack.replace("#", "", 1)
-                rack_tiles += letter.lower()
+        counts = Counter(rack)
+        rack_tiles = []
+        for pos in placements:
+            letter = word[pos]
+            if counts[letter]:
+                counts[letter] -= 1
+                rack_tiles.append(letter)
+            elif counts["#"]:
+                counts["#"] -= 1
+                rack_tiles.append(letter.lower())
             else:
                 return ""
-        return rack_tiles
+        return "".join(rack_tiles)
 
     @staticmethod
     def _validate_collection(collection):
@@ -404,7 +468,7 @@ class ScrabbleSolver(wordtools.WordHash):
         if isinstance(collection, str):
             with open(collection, "r") as file_text:
                 text = file_text.read()
-            return re.findall(r"[\w']+", text.upper())
+            return wordtools.split_words(text.upper())
 
         # Else an incorrect type has been received
         raise TypeError(
@@ -431,44 +495,35 @@ class ScrabbleSolver(wordtools.WordHash):
                 "Expected 15 rows, received %i.." % rows
             )
 
-        # Check board is a list of lists
-        element_lengths = set()
+        # Check each element is a list of 15 single character strings,
+        # replacing anything which is not a letter with "*" in the same pass
         for index, element in enumerate(board):
             if not isinstance(element, list):
                 raise TypeError(
                     "invalid value for 'board' parameter at index %i. "
                     "Expected list, received '%s'." % (index, type(element).__name__)
                 )
-            element_lengths.add(len(element))
-
-        # Check all lists are the same size
-        if element_lengths != {15}:
-            raise ValueError(
-                "invalid value for 'board' parameter. "
-                "Not all rows are 15 tiles long."
-            )
-
-        # Check each element in the lists are strings
-        for index, element in enumerate(board):
+            if len(element) != 15:
+                raise ValueError(
+                    "invalid value for 'board' parameter. "
+                    "Not all rows are 15 tiles long."
+                )
+            row = []
             for tile in element:
                 if not isinstance(tile, str):
                     raise TypeError(
                         "invalid value for 'board' parameter at index %i. "
                         "Not all elements are str, found '%s'" % (index, type(tile).__name__)
                     )
-            board[index] = [
-                (tile if tile.isalpha() else "*")
-                for tile in element
-            ]
-
-        # Check that each element of board is a single character
-        for index, element in enumerate(board):
-            for letter in element:
-                if len(letter) != 1:
+                if not tile.isalpha():
+                    tile = "*"
+                elif len(tile) != 1:
                     raise ValueError(
                         "invalid value for 'board' parameter at index %i. "
-                        "Cannot convert '%s' into a letter." % (index, letter)
+                        "Cannot convert '%s' into a letter." % (index, tile)
                     )
+                row.append(tile)
+            board[index] = row
 
         return np.array(board)
 
@@ -532,3 +587,151 @@ class ScrabbleSolver(wordtools.WordHash):
             )
 
         return attempt
+
+
+def _scan_row(codes, adjacent, rack_size):
+    """
+        Finds where words could be placed along a row, without consulting
+        the Dictionary. Only the board layout is used, so the words
+        fitting each position are searched for by the caller.
+
+        Parameters:
+        > codes (list) - codes of the row, see _encode_board
+        > adjacent (list) - for each position in the row, whether a tile
+            placed there is vertically adjacent to another tile, or is
+            on the centre of the board
+        > rack_size (int) - the maximum number of tiles which can be
+            placed
+
+        Returns:
+        > (list) - pairs (x, ends) for each x coordinate a word could
+            begin at, ends[n] being whether a word of length n could be
+            placed there. The last entry of ends is always True.
+    """
+    starts = []
+    width = len(codes)
+    for x in range(width):
+
+        # Not interested in positions with a preceding tile to the left
+        if x and codes[x-1] != FREE_CODE:
+            continue
+
+        # placed : number of tiles placed since the first
+        # touching : does the tile stream touch tiles on the board
+        ends, placed, touching = [], 0, False
+
+        # Streams tiles horizontally from x, a word can end before any
+        # free position once the stream touches the tiles on the board
+        for n in range(width):
+            code = codes[x+n] if x + n < width else OUTSIDE_CODE
+            ends.append(touching and code < 0)
+            if code >= 0:
+                touching = True
+            elif code == OUTSIDE_CODE:
+                break
+            else:
+                if placed == rack_size:
+                    break
+                placed += 1
+                touching = touching or adjacent[x+n]
+
+        while ends and not ends[-1]:
+            ends.pop()
+        if ends:
+            starts.append((x, ends))
+
+    return starts
+
+
+def _extend_right(trie, row, rack, n, state, placed, totals, letters, hits):
+    """
+        Depth first search of the words which can be placed along a row
+        from a given x coordinate, having already placed the first n
+        letters. The letters are found by following the trie, taking
+        tiles on the board as they are and filling free positions from
+        the rack, so only Dictionary words are ever formed. Rack tiles
+        are used before blanks, as in _get_rack_tiles. The score of each
+        word is totalled as its letters are placed, in the same way as
+        _yield_solutions.
+
+        Parameters:
+        > trie (tuple) - the WordArray arrays (base, check, is_terminal)
+        > row (tuple) - (codes, ends, allowed, minor, letter_mult,
+            word_mult, values), the row from the x coordinate onwards
+            codes (list) : see _encode_board. Only the codes of the
+                tiles "A" to "Z" are letter indices of the trie, other
+                tiles can never be part of a word
+            ends (list) : see _scan_row
+            allowed (list) : for each position, for each letter index,
+                whether the letter can be placed there
+            minor (list) : for each position, the minor scores of each
+                TILE_LANES
+            letter_mult, word_mult (list) : premium multipliers of each
+                position
+            values (list) : the value of each TILE_LANES
+        > rack (tuple) - (counts, codes)
+            counts (list) : the number of each letter in the rack,
+                followed by the number of blanks. Updated in place while
+                searching.
+            codes (list) : the letter indices of the letters in the rack
+        > n (int) - number of letters placed so far
+        > state (int) - trie state of the letters placed so far
+        > placed (int) - number of tiles placed from the rack
+        > totals (tuple) - (minor_total, value_total, word_mult) of the
+            letters placed so far
+        > letters (list) - the letters placed so far, blanks in lower case
+        > hits (list) - the (word, score) pairs of each word found are
+            appended to this list
+    """
+    base, check, is_terminal = trie
+    codes, ends, allowed, minor, letter_mult, word_mult, values = row
+    counts, rack_codes = rack
+    minor_total, value_total, word_total = totals
+    if placed and ends[n] and is_terminal[state]:
+        bingo_bonus = 50 if placed == 7 else 0
+        score = minor_total + value_total * word_total + bingo_bonus
+        hits.append(("".join(letters), score))
+    if n + 1 == len(ends):
+        return
+    code = codes[n]
+    offset = base[state]
+
+    # Follow the tile already on the board
+    if code != FREE_CODE:
+        if code < wordtools.LETTER_COUNT and check[offset + code] == state:
+            letters.append(TILE_LETTERS[code])
+            _extend_right(
+                trie, row, rack, n + 1, offset + code, placed,
+                (minor_total, value_total + values[code], word_total),
+                letters, hits
+            )
+            letters.pop()
+        return
+
+    # Try each letter of the rack, or any letter while a blank is left
+    if counts[wordtools.LETTER_COUNT]:
+        choices = range(wordtools.LETTER_COUNT)
+    else:
+        choices = [code for code in rack_codes if counts[code]]
+    for code in choices:
+        if check[offset + code] != state or not allowed[n][code]:
+            continue
+        if counts[code]:
+            tile, lane = code, code
+        elif counts[wordtools.LETTER_COUNT]:
+            tile, lane = wordtools.LETTER_COUNT, code + wordtools.LETTER_COUNT
+        else:
+            continue
+        counts[tile] -= 1
+        letters.append(TILE_LETTERS[lane])
+        _extend_right(
+            trie, row, rack, n + 1, offset + code, placed + 1,
+            (
+                minor_total + minor[n][lane],
+                value_total + values[lane] * letter_mult[n],
+                word_total * word_mult[n]
+            ),
+            letters, hits
+        )
+        letters.pop()
+        counts[tile] += 1
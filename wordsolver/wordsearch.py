@@ -3,8 +3,7 @@
 """
 
 from enum import Enum
-from itertools import chain
-import re
+import numpy as np
 
 from wordsolver import wordtools
 
@@ -26,10 +25,10 @@ class WordSearchSolver(wordtools.WordTree):
         Class for solving a Word Search.
 
         Attributes:
-        > grid (list) - 2d matrix representing letters and positions in a word
-            search grid
+        > grid (np.array) - 2d matrix of the letters in the word search grid
         > width (int) - width of the word search grid
         > height (int) - height of the word search grid
+        > min_length (int) - length of the shortest hidden word
     """
 
     DIRECTIONS = {
@@ -43,12 +42,24 @@ class WordSearchSolver(wordtools.WordTree):
         "NW": Direction.NORTH_WEST
     }
 
+    # The x, y change in position between letters in each direction
+    STEPS = {
+        Direction.NORTH: (0, -1),
+        Direction.NORTH_EAST: (1, -1),
+        Direction.EAST: (1, 0),
+        Direction.SOUTH_EAST: (1, 1),
+        Direction.SOUTH: (0, 1),
+        Direction.SOUTH_WEST: (-1, 1),
+        Direction.WEST: (-1, 0),
+        Direction.NORTH_WEST: (-1, -1)
+    }
+
     def __init__(self, collection):
         super().__init__()
         self.grid = None
         self.width = 0
         self.height = 0
-        self._yield_slice_funcs = dict()
+        self.min_length = 0
         self._setup(collection)
 
     def _setup(self, collection):
@@ -64,16 +75,19 @@ class WordSearchSolver(wordtools.WordTree):
         for word in self._validate_collection(collection):
             self.add_word(word.upper())
 
-        self._yield_slice_funcs = {
-            Direction.NORTH: self._yield_slices_north,
-            Direction.NORTH_EAST: self._yield_slices_north_east,
-            Direction.EAST: self._yield_slices_east,
-            Direction.SOUTH_EAST: self._yield_slices_south_east,
-            Direction.SOUTH: self._yield_slices_south,
-            Direction.SOUTH_WEST: self._yield_slices_south_west,
-            Direction.WEST: self._yield_slices_west,
-            Direction.NORTH_WEST: self._yield_slices_north_west
-        }
+    def add_word(self, word):
+        """Adds a word into the tree data structure, keeping min_length
+        up to date."""
+        super().add_word(word)
+        if len(self.word_set) == 1:
+            self.min_length = len(word)
+        else:
+            self.min_length = min(self.min_length, len(word))
+
+    def clear_words(self):
+        """Clears the all words from the tree data structure."""
+        super().clear_words()
+        self.min_length = 0
 
     def solve(self, grid, directions=None):
         """
@@ -98,15 +112,11 @@ class WordSearchSolver(wordtools.WordTree):
 
         self.width = len(grid[0])
         self.height = len(grid)
-        self.grid = [
-            [((col, row), grid[row][col].upper()) for col in range(self.width)]
-            for row in range(self.height)
-        ]
+        self.grid = np.array(grid, dtype=str).reshape(self.height, self.width)
 
         solutions = list()
-        for grid_slice in self._generate_slices(directions):
-            for solution in self._get_solutions(grid_slice):
-                solutions.append(solution)
+        for grid_slice, start, step in self._generate_slices(directions):
+            solutions.extend(self._get_solutions(grid_slice.tolist(), start, step))
 
         return solutions
 
@@ -115,104 +125,93 @@ class WordSearchSolver(wordtools.WordTree):
             Generator function used to extract word search grid slices.
 
             Parameters:
-            > direction (Direction) - the direction to take the slices in
+            > directions (iterable) - the Directions to take the slices in
 
             Yields:
-            > grid_slice (list) - a grid slice of the word search grid, in the
-                given 'direction'
+            > (grid_slice, start, step)
+                grid_slice (np.array) : a view of the letters of a grid slice
+                    of the word search grid, in one of the 'directions'
+                start (int, int) : x, y position of the first letter
+                step (int, int) : x, y change in position between letters
         """
-        generators = [
-            func() for direction, func in self._yield_slice_funcs.items()
-            if direction in directions
-        ]
-
-        for grid_slice in chain(*generators):
-            yield grid_slice
-
-    def _yield_slices_north(self):
-        """Yield grid slices in a north direction."""
-        for col in range(self.width):
-            grid_slice = list()
-            for row in range(self.height - 1, -1, -1):
-                grid_slice.append(self.grid[row][col])
-            yield grid_slice
-
-    def _yield_slices_north_east(self):
-        """Yield grid slices in a north-east direction."""
-        for diag in range(self.width + self.height - 1):
-            grid_slice = list()
-            for col in range(max(0, 1-self.height+diag), min(self.width, diag+1)):
-                grid_slice.append(self.grid[diag-col][col])
-            yield grid_slice
-
-    def _yield_slices_east(self):
-        """Yield grid slices in an east direction."""
-        for row in range(self.height):
-            grid_slice = list()
-            for col in range(self.width):
-                grid_slice.append(self.grid[row][col])
-            yield grid_slice
-
-    def _yield_slices_south_east(self):
-        """Yield grid slices in a south-east direction."""
-        for diag in range(self.width + self.height - 1):
-            grid_slice = list()
-            for col in range(max(0, 1-self.height+diag), min(self.width, diag+1)):
-                grid_slice.append(self.grid[col-diag + self.height - 1][col])
-            yield grid_slice
-
-    def _yield_slices_south(self):
-        """Yield grid slices in a south direction."""
-        for col in range(self.width):
-            grid_slice = list()
-            for row in range(self.height):
-                grid_slice.append(self.grid[row][col])
-            yield grid_slice
-
-    def _yield_slices_south_west(self):
-        """Yield grid slices in a south-west direction."""
-        for diag in range(self.width + self.height - 1):
-            grid_slice = list()
-            for col in range(min(self.width, diag+1) - 1, max(0, 1-self.height+diag) - 1, -1):
-                grid_slice.append(self.grid[diag-col][col])
-            yield grid_slice
-
-    def _yield_slices_west(self):
-        """Yield grid slices in a west direction."""
-        for row in range(self.height):
-            grid_slice = list()
-            for col in range(self.width-1, -1, -1):
-                grid_slice.append(self.grid[row][col])
-            yield grid_slice
-
-    def _yield_slices_north_west(self):
-        """Yield grid slices in a north-west direction."""
-        for diag in range(self.width + self.height - 1):
-            grid_slice = list()
-            for col in range(min(self.width, diag+1) - 1, max(0, 1-self.height+diag) - 1, -1):
-                grid_slice.append(self.grid[col-diag + self.height - 1][col])
-            yield grid_slice
-
-    def _get_solutions(self, grid_slice):
+        for direction, step in self.STEPS.items():
+            if direction not in directions:
+                continue
+
+            # Skip slices too short to hold any hidden word
+            for grid_slice, start, slice_step in self._yield_slices(step):
+                if len(grid_slice) >= self.min_length:
+                    yield grid_slice, start, slice_step
+
+    def _yield_slices(self, step):
         """
-            Generator function for finding words in a word search grid slice.
+            Yield grid slices in the direction with the given step. The
+            grid is flipped so that the slices run left to right and top
+            to bottom, and positions are flipped back when yielded.
 
             Parameters:
-            > grid_slice (list) - a slice of the word search grid
+            > step (int, int) - x, y change in position between letters
 
             Yields:
-            > word (str) - a word found in the grid slice
+            > (grid_slice, start, step) - as described in _generate_slices
+        """
+        col_step, row_step = step
+        grid = self.grid[::row_step or 1, ::col_step or 1]
+        if not row_step:
+            lines = [(grid[row], (0, row)) for row in range(self.height)]
+        elif not col_step:
+            lines = [(grid[:, col], (col, 0)) for col in range(self.width)]
+        else:
+            offsets = range(1 - self.height, self.width)
+            if col_step < 0:
+                # Keep the diagonals in the order of the unflipped grid
+                offsets = reversed(offsets)
+            lines = [
+                (grid.diagonal(offset), (max(0, offset), max(0, -offset)))
+                for offset in offsets
+            ]
+        for grid_slice, (col, row) in lines:
+            if col_step < 0:
+                col = self.width - 1 - col
+            if row_step < 0:
+                row = self.height - 1 - row
+            yield grid_slice, (col, row), step
+
+    def _get_solutions(self, grid_slice, start, step):
+        """
+            Finds the words in a word search grid slice.
+
+            Parameters:
+            > grid_slice (list) - letters of a slice of the word search grid
+            > start (int, int) - x, y position of the first letter
+            > step (int, int) - x, y change in position between letters
+
+            Returns:
+            > (list) - (word, start_pos, end_pos) for each word found in
+                the grid slice
         """
-        for pos, begin_entry in enumerate(grid_slice):
-            if not self.root.get_child(begin_entry[1]):
+        (col, row), (col_step, row_step) = start, step
+        last_begin = len(grid_slice) - self.min_length
+
+        # Positions whose letter begins no word are skipped with a single
+        # lookup in the children of the root
+        first_nodes = self.root.children
+        solutions = []
+        for pos, begin_letter in enumerate(grid_slice[:last_begin + 1]):
+            node = first_nodes.get(begin_letter)
+            if not node:
                 continue
-            node = self.root.get_child(begin_entry[1])
-            for end_entry in grid_slice[pos+1:]:
-                node = node.get_child(end_entry[1])
+            for end in range(pos+1, len(grid_slice)):
+                node = node.children.get(grid_slice[end])
                 if not node:
                     break
                 if node.my_word:
-                    yield (node.my_word, begin_entry[0], end_entry[0])
+                    solutions.append((
+                        node.my_word,
+                        (col + pos*col_step, row + pos*row_step),
+                        (col + end*col_step, row + end*row_step)
+                    ))
+        return solutions
 
     @staticmethod
     def _validate_collection(collection):
@@ -226,7 +225,7 @@ class WordSearchSolver(wordtools.WordTree):
         if isinstance(collection, str):
             with open(collection, "r") as file_text:
                 text = file_text.read()
-            return re.findall(r"[\w']+", text)
+            return wordtools.split_words(text)
 
         # Else an incorrect type has been received
         raise TypeError(
@@ -245,41 +244,34 @@ class WordSearchSolver(wordtools.WordTree):
                 "Expected list, received '%s'." % type(grid).__name__
             )
 
-        # Check grid is a list of lists
-        element_lengths = set()
+        # Check each element is a list of single letters, all the same size,
+        # converting the letters to upper case in the same pass
         for index, element in enumerate(grid):
             if not isinstance(element, list):
                 raise TypeError(
                     "invalid value for 'grid' parameter at index %i. "
                     "Expected list, received '%s'." % (index, type(element).__name__)
                 )
-            element_lengths.add(len(element))
-
-        # Check all lists are the same size
-        if len(element_lengths) > 1:
-            raise ValueError(
-                "invalid value for 'grid' parameter. "
-                "Not all rows are the same size."
-            )
-
-        # Check each element in the lists are strings
-        for index, element in enumerate(grid):
+            if len(element) != len(grid[0]):
+                raise ValueError(
+                    "invalid value for 'grid' parameter. "
+                    "Not all rows are the same size."
+                )
+            row = []
             for tile in element:
                 if not isinstance(tile, str):
                     raise TypeError(
                         "invalid value for 'grid' parameter at index %i. "
                         "Not all elements are str, found '%s'" % (index, type(tile).__name__)
                     )
-            grid[index] = [tile.upper() for tile in element]
-
-        # Check that each element of grid is a single letter
-        for index, element in enumerate(grid):
-            for letter in element:
+                letter = tile.upper()
                 if len(letter) != 1:
                     raise ValueError(
                         "invalid value for 'grid' parameter at index %i. "
                         "Cannot convert '%s' into a letter." % (index, letter)
                     )
+                row.append(letter)
+            grid[index] = row
         return grid
 
     def _validate_directions(self, directions):
@@ -3,7 +3,25 @@
     spelling more efficient.
 """
 
-from collections import defaultdict
+import os
+import re
+import zipfile
+from collections import defaultdict, deque
+from itertools import groupby
+from operator import itemgetter
+
+import numpy as np
+
+
+LETTER_COUNT = 26
+
+# Maps a character ordinal (0 - 255) to its letter index, 0 for "A" to 25
+# for "Z". All other characters are mapped to LETTER_COUNT.
+LETTER_LUT = np.full(256, LETTER_COUNT, dtype=np.int8)
+LETTER_LUT[ord("A"):ord("Z") + 1] = np.arange(LETTER_COUNT)
+
+_LETTERS_RE = re.compile(r"[A-Z]+")
+_WORDS_RE = re.compile(r"[\w']+")
 
 
 class WordNode():
@@ -12,37 +30,30 @@ class WordNode():
 
         Attributes:
         > letter (str) - value of the node
-        > children (list) - list of child node objects
+        > children (dict) - keys are letters, values are the child node
+            objects with that letter
         > my_word (str) - if this node completes a word, my_word is
             assigned to that word, else it equals ""
     """
 
+    __slots__ = ("letter", "children", "my_word")
+
     def __init__(self, letter=""):
         self.letter = letter
-        self.children = []
+        self.children = {}
         self.my_word = ""
 
     def add_child(self, letter):
         """Creates a new child WordNode object, assigning it with the
         given letter."""
         child = WordNode(letter)
-        self.children.append(child)
+        self.children[letter] = child
         return child
 
     def get_child(self, letter):
         """Returns the child WordNode with the given letter, if it
         exists."""
-        for child in self.children:
-            if child.letter == letter:
-                return child
-        return None
-
-    def delete(self):
-        """Deletes this WordNode object and all descendant child
-        nodes."""
-        for child in self.children:
-            child.delete()
-        del self
+        return self.children.get(letter)
 
 
 class WordTree():
@@ -72,12 +83,121 @@ class WordTree():
         self.word_set.add(word)
 
     def clear_words(self):
-        """Clears the all words from the tree data structure."""
-        for child in self.root.children:
-            child.delete()
+        """Clears the all words from the tree data structure. The nodes
+        removed are freed once they are no longer referenced."""
+        self.root.children.clear()
         self.word_set = set()
 
 
+class WordArray():
+    """
+        Double-array trie object, used as a compact and cache friendly
+        method for checking word spelling. The trie states are stored in
+        two flat arrays, the transition from state 'cur' with letter
+        index 'idx' (0 for "A" to 25 for "Z") being to state
+        base[cur] + idx, provided check[base[cur] + idx] == cur. The
+        root is state 0.
+
+        Attributes:
+        > base (np.array) - int32 array of the base offset of each state
+        > check (np.array) - int32 array of the parent of each state, -1
+            for unused states
+        > terminals (dict) - keys are states which complete a word,
+            values are the words
+        > is_terminal (np.array) - bool array, True for the states which
+            complete a word
+    """
+
+    def __init__(self):
+        self.base = np.zeros(LETTER_COUNT + 1, dtype=np.int32)
+        self.check = np.full(LETTER_COUNT + 1, -1, dtype=np.int32)
+        self.terminals = dict()
+        self.is_terminal = np.zeros(LETTER_COUNT + 1, dtype=np.bool_)
+
+    def set_words(self, words):
+        """Builds the double-array trie from the given words. The trie
+        cannot be added to, so any words previously set are replaced."""
+        self.base, self.check, self.terminals = build_double_array(words)
+        self.is_terminal = np.zeros(len(self.base), dtype=np.bool_)
+        self.is_terminal[list(self.terminals)] = True
+
+    def clear_words(self):
+        """Clears the all words from the double-array trie."""
+        self.base = np.zeros(LETTER_COUNT + 1, dtype=np.int32)
+        self.check = np.full(LETTER_COUNT + 1, -1, dtype=np.int32)
+        self.terminals = dict()
+        self.is_terminal = np.zeros(LETTER_COUNT + 1, dtype=np.bool_)
+
+    def follow(self, indices, state=0):
+        """Returns the state reached by following the given letter
+        indices (0 for "A" to 25 for "Z") from 'state', or -1 if no word
+        in the trie continues that way."""
+        for index in indices:
+            if state == -1 or not 0 <= index < LETTER_COUNT:
+                return -1
+            child = int(self.base[state]) + index
+            state = child if self.check[child] == state else -1
+        return state
+
+    def save(self, filename, key):
+        """
+            Saves the double-array trie to the .npz file 'filename'. The
+            words are stored as one newline separated UTF-8 buffer,
+            rather than as an array padded to the longest word. The
+            file is written to a temporary file first and then renamed,
+            so a partially written file is never loaded. Failure to write
+            the file is ignored.
+
+            Parameters:
+            > filename (str) - name of the file to save to
+            > key (str) - identifies the words the trie was built from,
+                the same key must be given to load the trie
+        """
+        temporary = "%s.%i.tmp" % (filename, os.getpid())
+        try:
+            with open(temporary, "wb") as file_data:
+                np.savez(
+                    file_data,
+                    key=np.array(key),
+                    base=self.base,
+                    check=self.check,
+                    states=np.array(list(self.terminals), dtype=np.int32),
+                    text=np.frombuffer(
+                        "\n".join(self.terminals.values()).encode("utf-8"),
+                        dtype=np.uint8
+                    )
+                )
+            os.replace(temporary, filename)
+        except OSError:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+
+    def load(self, filename, key):
+        """
+            Loads the double-array trie from the .npz file 'filename',
+            saved with the save method. Returns whether the trie was
+            loaded, which is False if the file is missing, unreadable or
+            was saved with a different key.
+
+            Parameters:
+            > filename (str) - name of the file to load from
+            > key (str) - identifies the words the trie was built from
+        """
+        try:
+            with np.load(filename) as data:
+                if str(data["key"]) != key:
+                    return False
+                base, check = data["base"], data["check"]
+                words = data["text"].tobytes().decode("utf-8").split("\n")
+                terminals = dict(zip(data["states"].tolist(), words))
+        except (OSError, KeyError, ValueError, zipfile.BadZipFile):
+            return False
+        self.base, self.check, self.terminals = base, check, terminals
+        self.is_terminal = np.zeros(len(self.base), dtype=np.bool_)
+        self.is_terminal[list(self.terminals)] = True
+        return True
+
+
 class WordHash():
     """
         Hash table object, used as an efficient method for looking up
@@ -101,9 +221,26 @@ class WordHash():
             hash_value = self._hasher(length, letter, position)
             self.hash_table[hash_value].add(word)
 
+    def add_words(self, words):
+        """Add all the given words to hash_table. Words are grouped by
+        length, then sorted and grouped by the letter at each position,
+        so each hash is computed once and each set is extended in
+        bulk."""
+        words_of_length = defaultdict(list)
+        for word in words:
+            words_of_length[len(word)].append(word)
+        for length, group in words_of_length.items():
+            for position in range(length):
+                key = itemgetter(position)
+                for letter, matches in groupby(sorted(group, key=key), key=key):
+                    hash_value = self._hasher(length, letter, position)
+                    self.hash_table[hash_value].update(matches)
+
     def lookup(self, length, letter, position):
         """Returns the set of added words with the given length and with
         the given letter in the given position."""
+        if len(letter) != 1:
+            return set()
         hash_value = self._hasher(length, letter, position)
         return self.hash_table[hash_value]
 
@@ -113,5 +250,115 @@ class WordHash():
 
     @staticmethod
     def _hasher(length, letter, position):
-        """Returns a hash combining the given arguments."""
-        return str(length) + letter + str(position)
+        """Returns a hash combining the given arguments, packed into an
+        int. The ordinal of a letter fits in 21 bits, as does the
+        position of any letter in a word shorter than 2 ** 21."""
+        return length << 42 | position << 21 | ord(letter)
+
+
+def is_letters(word):
+    """Returns whether 'word' is made only of the letters "A" to "Z",
+    which are the only letters a WordArray can hold."""
+    return _LETTERS_RE.fullmatch(word) is not None
+
+
+def split_words(text):
+    """
+        Returns the words in 'text', being the runs of word characters
+        and apostrophes. Word files usually hold only letters separated
+        by whitespace, in which case splitting on whitespace gives the
+        same words without running the pattern over the text.
+
+        Parameters:
+        > text (str) - text to be split into words
+
+        Returns:
+        > (list) - the words in the text, in order
+    """
+    words = text.split()
+    if "".join(words).isalpha():
+        return words
+    return _WORDS_RE.findall(text)
+
+
+def build_double_array(words):
+    """
+        Builds a double-array trie from the given words. Words which are
+        not made only of the letters "A" to "Z" are ignored, see
+        is_letters. The states are
+        placed in breadth first order, so shallow states are stored close
+        to the root.
+
+        Parameters:
+        > words (iterable) - upper case words to add to the trie
+
+        Returns:
+        > (tuple) - (base, check, terminals), see the WordArray class
+    """
+
+    # Build a temporary trie of dicts, mapping letter to node
+    nodes, ends = [{}], {}
+    for word in words:
+        if not is_letters(word):
+            continue
+        current = 0
+        for letter in word:
+            child = nodes[current].get(letter)
+            if child is None:
+                child = nodes[current][letter] = len(nodes)
+                nodes.append({})
+            current = child
+        ends[current] = word
+
+    # Place the states in breadth first order, each at the first base
+    # offset where all of its children are free
+    base, check, used = [0], [-1], bytearray(b"\x01")
+    terminals = dict()
+    queue = deque([(0, 0)])
+    first_free = 1
+    while queue:
+        node, state = queue.popleft()
+        if node in ends:
+            terminals[state] = ends[node]
+        if not nodes[node]:
+            continue
+        children = [(ord(letter) - 65, child) for letter, child in nodes[node].items()]
+        children.sort()
+        first, rest = children[0][0], [index for index, _ in children[1:]]
+        position = used.find(0, max(first_free, first + 1))
+        if position == -1:
+            position = len(used)
+        while True:
+            if len(used) <= position + LETTER_COUNT:
+                extension = position + 2 * LETTER_COUNT - len(used)
+                used.extend(bytes(extension))
+                base.extend([0] * extension)
+                check.extend([-1] * extension)
+            offset = position - first
+            for index in rest:
+                if used[offset + index]:
+                    break
+            else:
+                break
+            position = used.find(0, position + 1)
+            if position == -1:
+                position = len(used)
+        base[state] = offset
+        for index, child in children:
+            used[offset + index] = 1
+            check[offset + index] = state
+            queue.append((child, offset + index))
+        first_free = used.find(0, first_free)
+        if first_free == -1:
+            first_free = len(used)
+
+    # Pad so that any state and letter index (including LETTER_COUNT,
+    # used for tiles which are not letters) is within the arrays
+    padding = max(base) + LETTER_COUNT + 1 - len(base)
+    base.extend([0] * padding)
+    check.extend([-1] * padding)
+    return (
+        np.array(base, dtype=np.int32),
+        np.array(check, dtype=np.int32),
+        terminals
+    )